@@ -6,6 +6,7 @@ Reads a YAML config file and outputs interlinked Grafana-compatible JSON
 dashboards. Works with any Prometheus-monitored infrastructure.
 
 Dependencies: PyYAML (pip install pyyaml)
+Optional: orjson (pip install orjson) for faster JSON output
 
 Usage:
   ./grafana-dashboard-generator.py --config config.yaml
@@ -16,14 +17,19 @@ Usage:
 """
 import argparse
 import base64
+import http.client
 import json
 import os
 import re
+import string
 import sys
+import threading
+import urllib.parse
 import urllib.request
 import urllib.error
 import fnmatch
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
 
 try:
     import yaml
@@ -31,21 +37,55 @@ except ImportError:
     print("ERROR: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
     sys.exit(1)
 
+# prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ${name} references to constants and selectors
+_REF_RE = re.compile(r'\$\{(\w+)\}')
+_REF_CACHE_SIZE = 1024
+
+
+def _json_bytes(obj, indent=False, newline=False):
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, option=option)
+    data = json.dumps(obj, indent=2 if indent else None)
+    if newline:
+        data += "\n"
+    return data.encode("utf-8")
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # ID GENERATOR
 # ──────────────────────────────────────────────────────────────────────────────
 
 class IdGenerator:
+    __slots__ = ("_ids",)
+
     def __init__(self):
-        self._id = 0
+        self._ids = count(1)
 
     def reset(self):
-        self._id = 0
+        self._ids = count(1)
 
     def next(self):
-        self._id += 1
-        return self._id
+        return next(self._ids)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -53,15 +93,34 @@ class IdGenerator:
 # ──────────────────────────────────────────────────────────────────────────────
 
 class Config:
+    __slots__ = (
+        "data", "cli_args", "_palette",
+        "_ds_cache", "_ds_default", "_thresh_cache", "_ref_cache",
+    )
+
     def __init__(self, data, cli_args=None):
         self.data = data
         self.cli_args = cli_args or {}
         self._palette = self._resolve_palette()
+        # config is read-only for the whole run, so lookups are memoized
+        self._ds_cache = {}
+        self._ds_default = None
+        self._thresh_cache = {}
+        self._ref_cache = {}
 
     @classmethod
     def load(cls, path, cli_args=None):
-        with open(path) as f:
-            data = yaml.safe_load(f)
+        """Load a YAML config; multiple documents are merged section by section."""
+        data = {}
+        with open(path, "rb") as f:
+            for doc in yaml.load_all(f, Loader=_SafeLoader):
+                if not doc:
+                    continue
+                for key, value in doc.items():
+                    if isinstance(value, dict) and isinstance(data.get(key), dict):
+                        data[key].update(value)
+                    else:
+                        data[key] = value
         return cls(data, cli_args)
 
     def _resolve_palette(self):
@@ -73,10 +132,14 @@ class Config:
         return self.data.get("generator", {})
 
     def get_datasource(self, name):
-        ds = self.data.get("datasources", {}).get(name)
-        if not ds:
-            raise ValueError(f"datasource '{name}' not defined in config")
-        return {"type": ds["type"], "uid": ds["uid"]}
+        """Datasource ref for a name (shared, treat as read-only)."""
+        cached = self._ds_cache.get(name)
+        if cached is None:
+            ds = self.data.get("datasources", {}).get(name)
+            if not ds:
+                raise ValueError(f"datasource '{name}' not defined in config")
+            cached = self._ds_cache[name] = {"type": ds["type"], "uid": ds["uid"]}
+        return cached
 
     def get_datasource_url(self, name):
         ds = self.data.get("datasources", {}).get(name, {})
@@ -90,6 +153,11 @@ class Config:
         return next(iter(ds), "")
 
     def get_default_datasource(self):
+        if self._ds_default is None:
+            self._ds_default = self._find_default_datasource()
+        return self._ds_default
+
+    def _find_default_datasource(self):
         ds_map = self.data.get("datasources", {})
         for name, ds in ds_map.items():
             if ds.get("is_default"):
@@ -100,15 +168,19 @@ class Config:
         return {"type": "prometheus", "uid": "prometheus"}
 
     def get_thresholds(self, name):
+        """Resolved threshold steps for a named set (shared, treat as read-only)."""
+        if name in self._thresh_cache:
+            return self._thresh_cache[name]
         t = self.data.get("thresholds", {}).get(name)
-        if t is None:
-            return None
-        resolved = []
-        for step in t:
-            s = dict(step)
-            if isinstance(s.get("color"), str) and s["color"].startswith("$"):
-                s["color"] = self._resolve_color(s["color"][1:])
-            resolved.append(s)
+        resolved = None
+        if t is not None:
+            resolved = []
+            for step in t:
+                s = dict(step)
+                if isinstance(s.get("color"), str) and s["color"].startswith("$"):
+                    s["color"] = self._resolve_color(s["color"][1:])
+                resolved.append(s)
+        self._thresh_cache[name] = resolved
         return resolved
 
     def get_selector(self, name):
@@ -136,24 +208,29 @@ class Config:
     def _resolve_color(self, name):
         return self._palette.get(name, name)
 
+    def _replace_braced(self, m):
+        ref_name = m.group(1)
+        c = self.get_constant(ref_name)
+        if c:
+            return c
+        s = self.get_selector(ref_name)
+        if s:
+            return s
+        return m.group(0)
+
     def resolve_ref(self, value):
         """Resolve $references and ${references} in a string value."""
-        if not isinstance(value, str):
+        if not isinstance(value, str) or "${" not in value:
             return value
 
-        # resolve ${name} references (constants and selectors)
-        def replace_braced(m):
-            ref_name = m.group(1)
-            c = self.get_constant(ref_name)
-            if c:
-                return c
-            s = self.get_selector(ref_name)
-            if s:
-                return s
-            return m.group(0)
-
-        value = re.sub(r'\$\{(\w+)\}', replace_braced, value)
-        return value
+        resolved = self._ref_cache.get(value)
+        if resolved is None:
+            if len(self._ref_cache) >= _REF_CACHE_SIZE:
+                self._ref_cache.clear()
+            # resolve ${name} references (constants and selectors)
+            resolved = _REF_RE.sub(self._replace_braced, value)
+            self._ref_cache[value] = resolved
+        return resolved
 
     def resolve_color(self, value):
         """Resolve a $color_name reference to a hex color."""
@@ -181,6 +258,8 @@ class Config:
 # ──────────────────────────────────────────────────────────────────────────────
 
 class LayoutEngine:
+    __slots__ = ("grid_width", "cursor_x", "cursor_y", "row_height")
+
     def __init__(self, grid_width=24):
         self.grid_width = grid_width
         self.cursor_x = 0
@@ -192,6 +271,15 @@ class LayoutEngine:
         self.cursor_y = 0
         self.row_height = 0
 
+    def fork(self):
+        """Fresh engine on the same grid, e.g. for panels nested in a collapsed row."""
+        other = LayoutEngine.__new__(LayoutEngine)
+        other.grid_width = self.grid_width
+        other.cursor_x = 0
+        other.cursor_y = 0
+        other.row_height = 0
+        return other
+
     def add_row(self):
         if self.cursor_x > 0:
             self.cursor_y += self.row_height
@@ -204,15 +292,15 @@ class LayoutEngine:
         return y
 
     def place(self, width, height):
-        if self.cursor_x + width > self.grid_width:
+        x = self.cursor_x
+        if x + width > self.grid_width:
             self.cursor_y += self.row_height
-            self.cursor_x = 0
+            x = 0
             self.row_height = 0
-        x = self.cursor_x
-        y = self.cursor_y
-        self.cursor_x += width
-        self.row_height = max(self.row_height, height)
-        return x, y
+        self.cursor_x = x + width
+        if height > self.row_height:
+            self.row_height = height
+        return x, self.cursor_y
 
     def finish_section(self):
         if self.cursor_x > 0:
@@ -243,20 +331,131 @@ DEFAULT_SIZES = {
     "comparison": (12, 8),
 }
 
+# invariant sub-trees shared by every generated panel. these are referenced,
+# not copied, so they must never be mutated after construction.
+_HIDE_FROM = {"legend": False, "tooltip": False, "viz": False}
+_TOOLTIP_MULTI = {"mode": "multi", "sort": "desc"}
+_COLOR_THRESHOLDS = {"mode": "thresholds"}
+_LEGEND_LIST_BOTTOM = {"displayMode": "list", "placement": "bottom", "showLegend": True}
+_LEGEND_LIST_BOTTOM_NO_CALCS = {"calcs": [], **_LEGEND_LIST_BOTTOM}
+
+# templates list every key in output order; per-panel values override in place
+_TS_CUSTOM = {
+    "axisBorderShow": False,
+    "axisCenteredZero": False,
+    "axisColorMode": "text",
+    "axisLabel": "",
+    "axisPlacement": "auto",
+    "barAlignment": 0,
+    "barWidthFactor": 0.6,
+    "drawStyle": "line",
+    "fillOpacity": 8,
+    "gradientMode": "scheme",
+    "hideFrom": _HIDE_FROM,
+    "insertNulls": False,
+    "lineInterpolation": "smooth",
+    "lineWidth": 1,
+    "pointSize": 5,
+    "scaleDistribution": {"type": "linear"},
+    "showPoints": "never",
+    "spanNulls": False,
+    "stacking": {"group": "A", "mode": "none"},
+    "thresholdsStyle": {"mode": "off"},
+}
+
+_HEATMAP_CUSTOM = {"fillOpacity": 80, "hideFrom": _HIDE_FROM, "lineWidth": 1}
+_HEATMAP_THRESHOLDS = {"mode": "absolute", "steps": [{"color": "green", "value": None}]}
+_HEATMAP_COLOR = {
+    "exponent": 0.5,
+    "fill": "dark-blue",
+    "min": 0,
+    "mode": "scheme",
+    "reverse": False,
+    "scale": "exponential",
+    "scheme": "Spectral",
+    "steps": 128,
+}
+_HEATMAP_Y_AXIS = {"axisPlacement": "left", "reverse": False, "unit": "short"}
+_HEATMAP_OPTIONS = {
+    "calculate": False,
+    "cellGap": 2,
+    "cellValues": {"decimals": 0},
+    "color": _HEATMAP_COLOR,
+    "exemplars": {"color": "rgba(153,204,255,0.7)"},
+    "filterValues": {"le": 1e-9},
+    "legend": {"show": True},
+    "rowsFrame": {"layout": "auto"},
+    "tooltip": {"show": True, "yHistogram": False},
+    "yAxis": _HEATMAP_Y_AXIS,
+}
+
+_TABLE_CELL_OPTIONS = {"type": "auto"}
+_TABLE_FOOTER = {
+    "countRows": False,
+    "enablePagination": False,
+    "fields": "",
+    "reducer": ["sum"],
+    "show": False,
+}
+
+_TEXT_CODE = {"language": "plaintext", "showLineNumbers": False, "showMiniMap": False}
+
+# comparison panels are timeseries with default styling on a mixed datasource
+_MIXED_DS = {"type": "datasource", "uid": "-- Mixed --"}
+_COMPARISON_DEFAULTS = {
+    "color": {"mode": "palette-classic-by-name"},
+    "custom": _TS_CUSTOM,
+    "mappings": [],
+    "thresholds": {"mode": "absolute", "steps": [{"color": "#73BF69", "value": None}]},
+    "unit": "short",
+}
+_COMPARISON_OPTIONS = {"legend": _LEGEND_LIST_BOTTOM_NO_CALCS, "tooltip": _TOOLTIP_MULTI}
+
+# target refIds by position; chr() only past Z
+_REF_IDS = string.ascii_uppercase
+_DEFAULT_LEGEND = "{{instance}}"
+
 
 class PanelFactory:
+    __slots__ = ("config", "id_gen", "_default_ds", "_ds_by_name", "_fallback_thresh_cache")
+
+    # panel type -> factory method name, used by from_config()
+    _DISPATCH = {
+        "stat": "stat",
+        "gauge": "gauge",
+        "timeseries": "timeseries",
+        "bargauge": "bargauge",
+        "heatmap": "heatmap",
+        "histogram": "histogram",
+        "table": "table",
+        "piechart": "piechart",
+        "state-timeline": "state_timeline",
+        "status-history": "status_history",
+        "text": "text",
+        "logs": "logs",
+    }
+
     def __init__(self, config, id_gen):
         self.config = config
         self.id_gen = id_gen
+        self._default_ds = config.get_default_datasource()
+        self._ds_by_name = {}
+        self._fallback_thresh_cache = {}
+
+    def _named_ds(self, name):
+        ds = self._ds_by_name.get(name)
+        if ds is None:
+            ds = self._ds_by_name[name] = self.config.get_datasource(name)
+        return ds
 
     def _ds(self, panel_cfg):
         ds_name = panel_cfg.get("datasource")
         if ds_name:
-            return self.config.get_datasource(ds_name)
-        return self.config.get_default_datasource()
+            return self._named_ds(ds_name)
+        return self._default_ds
 
-    def _target(self, expr, legend="{{instance}}", ref_id="A", datasource=None):
-        ds = datasource or self.config.get_default_datasource()
+    def _target(self, expr, legend=_DEFAULT_LEGEND, ref_id="A", datasource=None):
+        ds = datasource if datasource is not None else self._default_ds
         return {
             "datasource": ds,
             "editorMode": "code",
@@ -266,21 +465,20 @@ class PanelFactory:
             "refId": ref_id,
         }
 
-    def _build_targets(self, panel_cfg, datasource=None):
+    def _build_targets(self, panel_cfg, ds):
         targets = []
-        ds = datasource or self._ds(panel_cfg)
 
         if "query" in panel_cfg:
-            legend = panel_cfg.get("legend", "{{instance}}")
+            legend = panel_cfg.get("legend", _DEFAULT_LEGEND)
             targets.append(self._target(panel_cfg["query"], legend, "A", ds))
 
         if "targets" in panel_cfg:
             for i, t in enumerate(panel_cfg["targets"]):
                 t_ds = ds
                 if "datasource" in t:
-                    t_ds = self.config.get_datasource(t["datasource"])
-                legend = t.get("legend", "{{instance}}")
-                ref = chr(65 + i)
+                    t_ds = self._named_ds(t["datasource"])
+                legend = t.get("legend", _DEFAULT_LEGEND)
+                ref = _REF_IDS[i] if i < 26 else chr(65 + i)
                 targets.append(self._target(t["expr"], legend, ref, t_ds))
 
         return targets
@@ -294,7 +492,14 @@ class PanelFactory:
         color = default_color or "#73BF69"
         if panel_cfg.get("color"):
             color = self.config.resolve_color(panel_cfg["color"])
-        return [{"color": color, "value": None}]
+        return self._fallback_steps(color)
+
+    def _fallback_steps(self, color):
+        # single base-color step, shared by every panel using the same color
+        steps = self._fallback_thresh_cache.get(color)
+        if steps is None:
+            steps = self._fallback_thresh_cache[color] = [{"color": color, "value": None}]
+        return steps
 
     def _overrides(self, panel_cfg):
         return panel_cfg.get("overrides", [])
@@ -307,24 +512,10 @@ class PanelFactory:
 
     def from_config(self, panel_cfg, x, y):
         ptype = panel_cfg["type"]
-        dispatch = {
-            "stat": self.stat,
-            "gauge": self.gauge,
-            "timeseries": self.timeseries,
-            "bargauge": self.bargauge,
-            "heatmap": self.heatmap,
-            "histogram": self.histogram,
-            "table": self.table,
-            "piechart": self.piechart,
-            "state-timeline": self.state_timeline,
-            "status-history": self.status_history,
-            "text": self.text,
-            "logs": self.logs,
-        }
-        fn = dispatch.get(ptype)
-        if not fn:
+        method = self._DISPATCH.get(ptype)
+        if not method:
             raise ValueError(f"unknown panel type: {ptype}")
-        return fn(panel_cfg, x, y)
+        return getattr(self, method)(panel_cfg, x, y)
 
     def row(self, title, y, collapsed=False, panels=None, repeat=None):
         r = {
@@ -347,13 +538,14 @@ class PanelFactory:
         steps = self._thresholds(cfg)
         color = self.config.resolve_color(cfg.get("color", ""))
         if color and len(steps) == 1:
-            steps = [{"color": color, "value": None}]
+            steps = self._fallback_steps(color)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": _COLOR_THRESHOLDS,
                     "mappings": self._value_mappings(cfg),
                     "thresholds": {"mode": "absolute", "steps": steps},
                     "unit": cfg.get("unit", "none"),
@@ -377,7 +569,7 @@ class PanelFactory:
                 "wideLayout": True,
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "stat",
@@ -387,12 +579,13 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["gauge"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": _COLOR_THRESHOLDS,
                     "mappings": self._value_mappings(cfg),
                     "max": cfg.get("max", 100),
                     "min": cfg.get("min", 0),
@@ -417,7 +610,7 @@ class PanelFactory:
                 "sizing": "auto",
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "gauge",
@@ -432,33 +625,21 @@ class PanelFactory:
         stack = cfg.get("stack", "none")
         draw = cfg.get("draw_style", "line")
         interpolation = cfg.get("line_interpolation", "smooth")
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
                     "color": {"mode": cfg.get("color_mode", "palette-classic-by-name")},
                     "custom": {
-                        "axisBorderShow": False,
-                        "axisCenteredZero": False,
-                        "axisColorMode": "text",
+                        **_TS_CUSTOM,
                         "axisLabel": cfg.get("axis_label", ""),
-                        "axisPlacement": "auto",
-                        "barAlignment": 0,
-                        "barWidthFactor": 0.6,
                         "drawStyle": draw,
                         "fillOpacity": fill,
-                        "gradientMode": "scheme",
-                        "hideFrom": {"legend": False, "tooltip": False, "viz": False},
-                        "insertNulls": False,
                         "lineInterpolation": interpolation,
                         "lineWidth": line,
-                        "pointSize": 5,
-                        "scaleDistribution": {"type": "linear"},
-                        "showPoints": "never",
-                        "spanNulls": False,
                         "stacking": {"group": "A", "mode": stack},
-                        "thresholdsStyle": {"mode": "off"},
                     },
                     "mappings": self._value_mappings(cfg),
                     "thresholds": {"mode": "absolute", "steps": self._thresholds(cfg)},
@@ -476,10 +657,10 @@ class PanelFactory:
                     "placement": cfg.get("legend_placement", "bottom"),
                     "showLegend": cfg.get("show_legend", True),
                 },
-                "tooltip": {"mode": "multi", "sort": "desc"},
+                "tooltip": _TOOLTIP_MULTI,
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "timeseries",
@@ -489,12 +670,13 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["bargauge"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": _COLOR_THRESHOLDS,
                     "mappings": self._value_mappings(cfg),
                     "max": cfg.get("max", 100),
                     "min": cfg.get("min", 0),
@@ -522,7 +704,7 @@ class PanelFactory:
                 "valueMode": "color",
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "bargauge",
@@ -533,19 +715,16 @@ class PanelFactory:
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
         scheme = cfg.get("color_scheme", "Spectral")
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
                     "color": {"mode": "continuous-GrYlRd"},
-                    "custom": {
-                        "fillOpacity": 80,
-                        "hideFrom": {"legend": False, "tooltip": False, "viz": False},
-                        "lineWidth": 1,
-                    },
+                    "custom": _HEATMAP_CUSTOM,
                     "mappings": [],
-                    "thresholds": {"mode": "absolute", "steps": [{"color": "green", "value": None}]},
+                    "thresholds": _HEATMAP_THRESHOLDS,
                     "unit": cfg.get("unit", "short"),
                 },
                 "overrides": self._overrides(cfg),
@@ -553,32 +732,19 @@ class PanelFactory:
             "gridPos": {"h": h, "w": w, "x": x, "y": y},
             "id": self.id_gen.next(),
             "options": {
+                **_HEATMAP_OPTIONS,
                 "calculate": cfg.get("calculate", False),
                 "cellGap": cfg.get("cell_gap", 2),
                 "cellValues": {"decimals": cfg.get("decimals", 0)},
                 "color": {
-                    "exponent": 0.5,
-                    "fill": "dark-blue",
-                    "min": 0,
-                    "mode": "scheme",
-                    "reverse": False,
+                    **_HEATMAP_COLOR,
                     "scale": cfg.get("color_scale", "exponential"),
                     "scheme": scheme,
-                    "steps": 128,
-                },
-                "exemplars": {"color": "rgba(153,204,255,0.7)"},
-                "filterValues": {"le": 1e-9},
-                "legend": {"show": True},
-                "rowsFrame": {"layout": "auto"},
-                "tooltip": {"show": True, "yHistogram": False},
-                "yAxis": {
-                    "axisPlacement": "left",
-                    "reverse": False,
-                    "unit": cfg.get("y_unit", "short"),
                 },
+                "yAxis": {**_HEATMAP_Y_AXIS, "unit": cfg.get("y_unit", "short")},
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "heatmap",
@@ -588,8 +754,9 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["histogram"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
@@ -597,7 +764,7 @@ class PanelFactory:
                     "custom": {
                         "fillOpacity": cfg.get("fill_opacity", 80),
                         "gradientMode": "none",
-                        "hideFrom": {"legend": False, "tooltip": False, "viz": False},
+                        "hideFrom": _HIDE_FROM,
                         "lineWidth": 1,
                     },
                     "mappings": [],
@@ -613,11 +780,11 @@ class PanelFactory:
                 "combine": cfg.get("combine", False),
                 "fillOpacity": cfg.get("fill_opacity", 80),
                 "gradientMode": "none",
-                "legend": {"calcs": [], "displayMode": "list", "placement": "bottom", "showLegend": True},
-                "tooltip": {"mode": "multi", "sort": "desc"},
+                "legend": _LEGEND_LIST_BOTTOM_NO_CALCS,
+                "tooltip": _TOOLTIP_MULTI,
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "histogram",
@@ -627,15 +794,16 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["table"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": _COLOR_THRESHOLDS,
                     "custom": {
                         "align": "auto",
-                        "cellOptions": {"type": "auto"},
+                        "cellOptions": _TABLE_CELL_OPTIONS,
                         "filterable": cfg.get("filterable", True),
                         "inspect": True,
                     },
@@ -650,18 +818,12 @@ class PanelFactory:
             "id": self.id_gen.next(),
             "options": {
                 "cellHeight": "sm",
-                "footer": {
-                    "countRows": False,
-                    "enablePagination": cfg.get("pagination", False),
-                    "fields": "",
-                    "reducer": ["sum"],
-                    "show": False,
-                },
+                "footer": {**_TABLE_FOOTER, "enablePagination": cfg.get("pagination", False)},
                 "showHeader": True,
                 "sortBy": cfg.get("sort_by", []),
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transformations": cfg.get("transformations", []),
             "transparent": cfg.get("transparent", True),
@@ -672,8 +834,9 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["piechart"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
@@ -699,10 +862,10 @@ class PanelFactory:
                     "calcs": cfg.get("calcs", ["lastNotNull"]),
                     "fields": "", "values": False,
                 },
-                "tooltip": {"mode": "multi", "sort": "desc"},
+                "tooltip": _TOOLTIP_MULTI,
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "piechart",
@@ -712,15 +875,16 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["state-timeline"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": _COLOR_THRESHOLDS,
                     "custom": {
                         "fillOpacity": cfg.get("fill_opacity", 70),
-                        "hideFrom": {"legend": False, "tooltip": False, "viz": False},
+                        "hideFrom": _HIDE_FROM,
                         "lineWidth": 0,
                     },
                     "mappings": self._value_mappings(cfg),
@@ -733,14 +897,14 @@ class PanelFactory:
             "id": self.id_gen.next(),
             "options": {
                 "alignValue": "center",
-                "legend": {"displayMode": "list", "placement": "bottom", "showLegend": True},
+                "legend": _LEGEND_LIST_BOTTOM,
                 "mergeValues": cfg.get("merge_values", True),
                 "rowHeight": cfg.get("row_height", 0.9),
                 "showValue": cfg.get("show_value", "auto"),
-                "tooltip": {"mode": "multi", "sort": "desc"},
+                "tooltip": _TOOLTIP_MULTI,
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "state-timeline",
@@ -750,15 +914,16 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["status-history"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": _COLOR_THRESHOLDS,
                     "custom": {
                         "fillOpacity": cfg.get("fill_opacity", 70),
-                        "hideFrom": {"legend": False, "tooltip": False, "viz": False},
+                        "hideFrom": _HIDE_FROM,
                         "lineWidth": 1,
                     },
                     "mappings": self._value_mappings(cfg),
@@ -771,13 +936,13 @@ class PanelFactory:
             "id": self.id_gen.next(),
             "options": {
                 "colWidth": 0.9,
-                "legend": {"displayMode": "list", "placement": "bottom", "showLegend": True},
+                "legend": _LEGEND_LIST_BOTTOM,
                 "rowHeight": cfg.get("row_height", 0.9),
                 "showValue": cfg.get("show_value", "auto"),
-                "tooltip": {"mode": "multi", "sort": "desc"},
+                "tooltip": _TOOLTIP_MULTI,
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "status-history",
@@ -793,7 +958,7 @@ class PanelFactory:
             "gridPos": {"h": h, "w": w, "x": x, "y": y},
             "id": self.id_gen.next(),
             "options": {
-                "code": {"language": "plaintext", "showLineNumbers": False, "showMiniMap": False},
+                "code": _TEXT_CODE,
                 "content": cfg.get("content", ""),
                 "mode": cfg.get("mode", "markdown"),
             },
@@ -807,8 +972,9 @@ class PanelFactory:
         dw, dh = DEFAULT_SIZES["logs"]
         w = cfg.get("width", dw)
         h = cfg.get("height", dh)
+        ds = self._ds(cfg)
         return {
-            "datasource": self._ds(cfg),
+            "datasource": ds,
             "description": cfg.get("description", ""),
             "gridPos": {"h": h, "w": w, "x": x, "y": y},
             "id": self.id_gen.next(),
@@ -823,7 +989,7 @@ class PanelFactory:
                 "wrapLogMessage": cfg.get("wrap", True),
             },
             "pluginVersion": "11.2.0",
-            "targets": self._build_targets(cfg),
+            "targets": self._build_targets(cfg, ds),
             "title": cfg.get("title", ""),
             "transparent": cfg.get("transparent", True),
             "type": "logs",
@@ -840,67 +1006,38 @@ class PanelFactory:
 
         metric = cfg.get("metric", "up")
         metric_type = cfg.get("metric_type", "gauge")
-        mixed_ds = {"type": "datasource", "uid": "-- Mixed --"}
+
+        # the query is the same for every datasource; only the target differs
+        if metric_type == "counter":
+            expr = self.config.resolve_ref(f"rate({metric}[5m])")
+        else:
+            expr = self.config.resolve_ref(metric)
 
         targets = []
         for i, ds_name in enumerate(ds_names):
-            ds = self.config.get_datasource(ds_name)
-            if metric_type == "counter":
-                expr = f"rate({metric}[5m])"
-            else:
-                expr = metric
+            ds = self._named_ds(ds_name)
             legend = cfg.get("legend", f"{ds_name}: {{{{instance}}}}")
             if f"{ds_name}" not in legend:
                 legend = f"{ds_name}: {legend}"
             targets.append({
                 "datasource": ds,
                 "editorMode": "code",
-                "expr": self.config.resolve_ref(expr),
+                "expr": expr,
                 "legendFormat": legend,
                 "range": True,
-                "refId": chr(65 + i),
+                "refId": _REF_IDS[i] if i < 26 else chr(65 + i),
             })
 
         return {
-            "datasource": mixed_ds,
+            "datasource": _MIXED_DS,
             "description": cfg.get("description", f"comparison: {metric}"),
             "fieldConfig": {
-                "defaults": {
-                    "color": {"mode": "palette-classic-by-name"},
-                    "custom": {
-                        "axisBorderShow": False,
-                        "axisCenteredZero": False,
-                        "axisColorMode": "text",
-                        "axisLabel": "",
-                        "axisPlacement": "auto",
-                        "barAlignment": 0,
-                        "barWidthFactor": 0.6,
-                        "drawStyle": "line",
-                        "fillOpacity": 8,
-                        "gradientMode": "scheme",
-                        "hideFrom": {"legend": False, "tooltip": False, "viz": False},
-                        "insertNulls": False,
-                        "lineInterpolation": "smooth",
-                        "lineWidth": 1,
-                        "pointSize": 5,
-                        "scaleDistribution": {"type": "linear"},
-                        "showPoints": "never",
-                        "spanNulls": False,
-                        "stacking": {"group": "A", "mode": "none"},
-                        "thresholdsStyle": {"mode": "off"},
-                    },
-                    "mappings": [],
-                    "thresholds": {"mode": "absolute", "steps": [{"color": "#73BF69", "value": None}]},
-                    "unit": cfg.get("unit", "short"),
-                },
+                "defaults": {**_COMPARISON_DEFAULTS, "unit": cfg.get("unit", "short")},
                 "overrides": [],
             },
             "gridPos": {"h": h, "w": w, "x": x, "y": y},
             "id": self.id_gen.next(),
-            "options": {
-                "legend": {"calcs": [], "displayMode": "list", "placement": "bottom", "showLegend": True},
-                "tooltip": {"mode": "multi", "sort": "desc"},
-            },
+            "options": _COMPARISON_OPTIONS,
             "pluginVersion": "11.2.0",
             "targets": targets,
             "title": cfg.get("title", f"{metric} comparison"),
@@ -909,20 +1046,118 @@ class PanelFactory:
         }
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# HTTP
+# ──────────────────────────────────────────────────────────────────────────────
+
+class HttpSession:
+    """Keep-alive HTTP client reusing one connection per host and thread."""
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conns(self):
+        # http.client connections are not thread-safe, so each thread keeps its own
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        return conns
+
+    def _urlopen(self, method, url, body, headers):
+        req = urllib.request.Request(url, data=body, headers=headers, method=method)
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return resp.read()
+
+    def request(self, method, url, body=None, headers=None):
+        """Return the response body; failures raise urllib.error.URLError/HTTPError."""
+        headers = headers or {}
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or urllib.request.getproxies().get(parts.scheme):
+            # leave proxied and non-http requests to urllib
+            return self._urlopen(method, url, body, headers)
+
+        key = (parts.scheme, parts.netloc)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        conns = self._conns()
+        for attempt in range(2):
+            conn = conns.get(key)
+            if conn is None:
+                cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+                conn = conns[key] = cls(parts.netloc, timeout=self.timeout)
+            reused = conn.sock is not None
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                del conns[key]
+                # an idle connection may have been dropped by the server; retry once
+                stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+                if stale and reused and attempt == 0:
+                    continue
+                raise urllib.error.URLError(e)
+            if 300 <= resp.status < 400:
+                # let urllib's redirect handling take it from here, as before
+                return self._urlopen(method, url, body, headers)
+            if not 200 <= resp.status < 300:
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            return data
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # METRIC DISCOVERY
 # ──────────────────────────────────────────────────────────────────────────────
 
+def _glob_filter(include_patterns=None, exclude_patterns=None):
+    """Predicate for names matching an include glob and no exclude glob."""
+    include = "|".join(fnmatch.translate(p) for p in include_patterns or ["*"])
+    if not exclude_patterns:
+        return re.compile(include).match
+    # one scan per name: the excludes become a negative lookahead
+    exclude = "|".join(fnmatch.translate(p) for p in exclude_patterns)
+    return re.compile(f"(?!{exclude})(?:{include})").match
+
+
+# globs made only of metric-name characters and * / ? translate directly to RE2
+_PUSHDOWN_GLOB_RE = re.compile(r'[A-Za-z0-9_:*?]+')
+
+
+def _glob_selector(patterns):
+    """PromQL series selector for metric-name globs, or None if not expressible."""
+    if not patterns or "*" in patterns:
+        return None
+    if not all(_PUSHDOWN_GLOB_RE.fullmatch(p) for p in patterns):
+        return None
+    alts = "|".join(p.replace("*", ".*").replace("?", ".") for p in patterns)
+    return f'{{__name__=~"{alts}"}}'
+
+
 class MetricDiscovery:
     def __init__(self, config):
         self.config = config
         self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._http = HttpSession()
+        self._pool = ThreadPoolExecutor(max_workers=8)
+
+    def _parallel(self, *calls):
+        """Run (fn, *args) calls on the worker pool, returning results in order."""
+        futures = [self._pool.submit(fn, *args) for fn, *args in calls]
+        return [f.result() for f in futures]
+
+    def _cache_set(self, key, value):
+        # concurrent misses on one key all end up sharing the first stored value
+        with self._cache_lock:
+            return self._cache.setdefault(key, value)
 
     def _get(self, url, path):
         full = f"{url.rstrip('/')}{path}"
         try:
-            resp = urllib.request.urlopen(full, timeout=30)
-            body = json.loads(resp.read())
+            body = _json_loads(self._http.request("GET", full))
             if body.get("status") != "success":
                 print(f"  warning: non-success response from {full}", file=sys.stderr)
                 return body.get("data", [])
@@ -931,14 +1166,19 @@ class MetricDiscovery:
             print(f"  error querying {full}: {e}", file=sys.stderr)
             return []
 
-    def fetch_metrics(self, ds_name):
+    def fetch_metrics(self, ds_name, match=None):
+        """Metric names on a datasource, optionally narrowed by a match[] selector."""
         url = self.config.get_datasource_url(ds_name)
         if not url:
             raise ValueError(f"no URL configured for datasource '{ds_name}'")
         key = f"metrics:{ds_name}"
+        path = "/api/v1/label/__name__/values"
+        if match:
+            key = f"{key}:{match}"
+            path = f"{path}?{urllib.parse.urlencode({'match[]': match})}"
         if key not in self._cache:
-            data = self._get(url, "/api/v1/label/__name__/values")
-            self._cache[key] = set(data) if isinstance(data, list) else set()
+            data = self._get(url, path)
+            return self._cache_set(key, set(data) if isinstance(data, list) else set())
         return self._cache[key]
 
     def fetch_metadata(self, ds_name):
@@ -947,7 +1187,8 @@ class MetricDiscovery:
             return {}
         key = f"metadata:{ds_name}"
         if key not in self._cache:
-            data = self._get(url, "/api/v1/metadata")
+            # only the first entry per metric is read, so don't ship the rest
+            data = self._get(url, "/api/v1/metadata?limit_per_metric=1")
             meta = {}
             if isinstance(data, dict):
                 for metric, info_list in data.items():
@@ -956,70 +1197,83 @@ class MetricDiscovery:
                             "type": info_list[0].get("type", "untyped"),
                             "help": info_list[0].get("help", ""),
                         }
-            self._cache[key] = meta
+            return self._cache_set(key, meta)
         return self._cache[key]
 
     def fetch_labels(self, ds_name):
         url = self.config.get_datasource_url(ds_name)
         if not url:
             return []
-        data = self._get(url, "/api/v1/labels")
-        return data if isinstance(data, list) else []
+        key = f"labels:{ds_name}"
+        if key not in self._cache:
+            data = self._get(url, "/api/v1/labels")
+            return self._cache_set(key, data if isinstance(data, list) else [])
+        return self._cache[key]
 
     def fetch_label_values(self, ds_name, label):
         url = self.config.get_datasource_url(ds_name)
         if not url:
             return []
-        data = self._get(url, f"/api/v1/label/{label}/values")
-        return data if isinstance(data, list) else []
-
-    def categorize(self, ds_a, ds_b):
-        metrics_a = self.fetch_metrics(ds_a)
-        metrics_b = self.fetch_metrics(ds_b)
-        meta_a = self.fetch_metadata(ds_a)
-        meta_b = self.fetch_metadata(ds_b)
-
-        shared = metrics_a & metrics_b
-        only_a = metrics_a - metrics_b
-        only_b = metrics_b - metrics_a
-
-        def enrich(names, meta_primary, meta_fallback):
-            result = {}
-            for m in sorted(names):
-                info = meta_primary.get(m, meta_fallback.get(m, {}))
-                result[m] = {
-                    "type": info.get("type", "untyped"),
-                    "help": info.get("help", ""),
-                }
-            return result
+        key = f"labelvalues:{ds_name}:{label}"
+        if key not in self._cache:
+            data = self._get(url, f"/api/v1/label/{label}/values")
+            return self._cache_set(key, data if isinstance(data, list) else [])
+        return self._cache[key]
 
-        return {
-            "shared": enrich(shared, meta_a, meta_b),
-            "only_a": enrich(only_a, meta_a, {}),
-            "only_b": enrich(only_b, {}, meta_b),
-        }
+    def categorize(self, ds_a, ds_b, include_patterns=None):
+        match = _glob_selector(include_patterns)
+        metrics_a, metrics_b, meta_a, meta_b = self._parallel(
+            (self.fetch_metrics, ds_a, match),
+            (self.fetch_metrics, ds_b, match),
+            (self.fetch_metadata, ds_a),
+            (self.fetch_metadata, ds_b),
+        )
+
+        # one sorted pass over the union; each bucket comes out in name order
+        shared, only_a, only_b = {}, {}, {}
+        no_meta = {}
+        for m in sorted(metrics_a | metrics_b):
+            if m in metrics_a:
+                if m in metrics_b:
+                    bucket = shared
+                    info = meta_a.get(m) or meta_b.get(m) or no_meta
+                else:
+                    bucket = only_a
+                    info = meta_a.get(m) or no_meta
+            else:
+                bucket = only_b
+                info = meta_b.get(m) or no_meta
+            bucket[m] = {
+                "type": info.get("type", "untyped"),
+                "help": info.get("help", ""),
+            }
+
+        return {"shared": shared, "only_a": only_a, "only_b": only_b}
 
     def filter_metrics(self, metrics, include_patterns=None, exclude_patterns=None):
-        include = include_patterns or ["*"]
-        exclude = exclude_patterns or []
-        filtered = set()
-        for m in metrics:
-            included = any(fnmatch.fnmatch(m, p) for p in include)
-            excluded = any(fnmatch.fnmatch(m, p) for p in exclude)
-            if included and not excluded:
-                filtered.add(m)
-        return filtered
+        keep = _glob_filter(include_patterns, exclude_patterns)
+        return {m for m in metrics if keep(m)}
+
+    def filter_categories(self, cats, include_patterns=None, exclude_patterns=None):
+        """Apply the globs to every bucket of a categorize() result."""
+        keep = _glob_filter(include_patterns, exclude_patterns)
+        return {bucket: {m: info for m, info in items.items() if keep(m)}
+                for bucket, items in cats.items()}
+
+    @staticmethod
+    def metric_prefix(metric):
+        head, sep, rest = metric.partition("_")
+        if not sep:
+            return head
+        return f"{head}_{rest.partition('_')[0]}"
 
     def group_by_prefix(self, metrics_dict):
-        groups = defaultdict(dict)
-        for metric, info in metrics_dict.items():
-            parts = metric.split("_")
-            if len(parts) >= 2:
-                prefix = f"{parts[0]}_{parts[1]}"
-            else:
-                prefix = parts[0]
-            groups[prefix][metric] = info
-        return dict(sorted(groups.items()))
+        groups = {}
+        prefix_of = self.metric_prefix
+        for m, info in metrics_dict.items():
+            groups.setdefault(prefix_of(m), {})[m] = info
+        # groups come out in prefix order, metrics in their original order
+        return {prefix: groups[prefix] for prefix in sorted(groups)}
 
     @staticmethod
     def suggest_panel_type(metric_type):
@@ -1044,120 +1298,110 @@ class MetricDiscovery:
             return metric_name
 
     def print_discovery(self, sources, include_patterns=None, exclude_patterns=None):
+        out = []
         if len(sources) == 1:
             ds_name = sources[0]
-            metrics = self.fetch_metrics(ds_name)
+            metrics, meta = self._parallel(
+                (self.fetch_metrics, ds_name, _glob_selector(include_patterns)),
+                (self.fetch_metadata, ds_name),
+            )
             metrics = self.filter_metrics(metrics, include_patterns, exclude_patterns)
-            meta = self.fetch_metadata(ds_name)
 
-            print(f"\n=== Metrics from {ds_name}: {len(metrics)} total ===\n")
+            out.append(f"\n=== Metrics from {ds_name}: {len(metrics)} total ===\n")
             grouped = self.group_by_prefix({m: meta.get(m, {"type": "untyped", "help": ""}) for m in metrics})
             for prefix, items in grouped.items():
-                print(f"# {prefix}_* ({len(items)} metrics)")
+                out.append(f"# {prefix}_* ({len(items)} metrics)")
                 for m, info in sorted(items.items()):
                     mtype = info["type"]
                     panel = self.suggest_panel_type(mtype)
-                    print(f"  {m:60s} ({mtype:10s}) -> {panel}")
-                print()
+                    out.append(f"  {m:60s} ({mtype:10s}) -> {panel}")
+                out.append("")
 
-            self._print_yaml_snippet(grouped, meta, ds_name)
+            out.extend(self._yaml_snippet_lines(grouped, meta, ds_name))
 
         elif len(sources) == 2:
-            cats = self.categorize(sources[0], sources[1])
-            cats["shared"] = {k: v for k, v in cats["shared"].items()
-                             if k in self.filter_metrics(set(cats["shared"].keys()), include_patterns, exclude_patterns)}
-            cats["only_a"] = {k: v for k, v in cats["only_a"].items()
-                             if k in self.filter_metrics(set(cats["only_a"].keys()), include_patterns, exclude_patterns)}
-            cats["only_b"] = {k: v for k, v in cats["only_b"].items()
-                             if k in self.filter_metrics(set(cats["only_b"].keys()), include_patterns, exclude_patterns)}
-
-            print(f"\n=== Metric Comparison ===")
-            print(f"  {sources[0]}: {len(cats['only_a']) + len(cats['shared'])} metrics")
-            print(f"  {sources[1]}: {len(cats['only_b']) + len(cats['shared'])} metrics")
-            print(f"  shared: {len(cats['shared'])}")
-            print(f"  {sources[0]} only: {len(cats['only_a'])}")
-            print(f"  {sources[1]} only: {len(cats['only_b'])}")
-
-            print(f"\n--- Shared Metrics ({len(cats['shared'])}) ---")
-            for m, info in sorted(cats["shared"].items()):
-                print(f"  {m:60s} ({info['type']})")
-
-            print(f"\n--- {sources[0]} Only ({len(cats['only_a'])}) ---")
-            for m, info in sorted(cats["only_a"].items()):
-                print(f"  {m:60s} ({info['type']})")
-
-            print(f"\n--- {sources[1]} Only ({len(cats['only_b'])}) ---")
-            for m, info in sorted(cats["only_b"].items()):
-                print(f"  {m:60s} ({info['type']})")
-
-            self._print_comparison_yaml(cats, sources)
-
-    def _print_yaml_snippet(self, grouped, meta, ds_name):
-        print("\n# --- suggested YAML config snippet ---\n")
-        print("dashboards:")
-        print("  discovered:")
-        print(f"    uid: discovered-{ds_name}")
-        print(f"    title: discovered metrics ({ds_name})")
-        print(f"    filename: discovered-{ds_name}.json")
-        print(f"    tags: [discovered]")
-        print(f"    variables: []")
-        print(f"    sections:")
+            cats = self.filter_categories(
+                self.categorize(sources[0], sources[1], include_patterns),
+                include_patterns, exclude_patterns,
+            )
+
+            out.append(f"\n=== Metric Comparison ===")
+            out.append(f"  {sources[0]}: {len(cats['only_a']) + len(cats['shared'])} metrics")
+            out.append(f"  {sources[1]}: {len(cats['only_b']) + len(cats['shared'])} metrics")
+            out.append(f"  shared: {len(cats['shared'])}")
+            out.append(f"  {sources[0]} only: {len(cats['only_a'])}")
+            out.append(f"  {sources[1]} only: {len(cats['only_b'])}")
+
+            out.append(f"\n--- Shared Metrics ({len(cats['shared'])}) ---")
+            out.extend(f"  {m:60s} ({info['type']})" for m, info in sorted(cats["shared"].items()))
+
+            out.append(f"\n--- {sources[0]} Only ({len(cats['only_a'])}) ---")
+            out.extend(f"  {m:60s} ({info['type']})" for m, info in sorted(cats["only_a"].items()))
+
+            out.append(f"\n--- {sources[1]} Only ({len(cats['only_b'])}) ---")
+            out.extend(f"  {m:60s} ({info['type']})" for m, info in sorted(cats["only_b"].items()))
+
+            out.extend(self._comparison_yaml_lines(cats, sources))
+
+        if out:
+            sys.stdout.write("\n".join(out) + "\n")
+
+    def _yaml_snippet_lines(self, grouped, meta, ds_name):
+        out = [
+            "\n# --- suggested YAML config snippet ---\n",
+            "dashboards:",
+            "  discovered:",
+            f"    uid: discovered-{ds_name}",
+            f"    title: discovered metrics ({ds_name})",
+            f"    filename: discovered-{ds_name}.json",
+            f"    tags: [discovered]",
+            f"    variables: []",
+            f"    sections:",
+        ]
         for prefix, items in grouped.items():
-            print(f"      - title: \"{prefix}\"")
-            print(f"        panels:")
-            for m, info in sorted(items.items()):
-                mtype = info.get("type", "untyped")
-                panel = self.suggest_panel_type(mtype)
-                query = self.suggest_query(m, mtype)
-                print(f"          - type: {panel}")
-                print(f"            title: \"{m}\"")
-                print(f"            query: '{query}'")
-
-    def _print_comparison_yaml(self, cats, sources):
-        print("\n# --- suggested comparison YAML snippet ---\n")
-        print("dashboards:")
-        print("  comparison:")
-        print(f"    uid: metric-comparison")
-        print(f"    title: metric comparison")
-        print(f"    filename: metric-comparison.json")
-        print(f"    tags: [comparison]")
-        print(f"    variables: []")
-        print(f"    sections:")
+            out.append(f"      - title: \"{prefix}\"\n        panels:")
+            out.extend(self._snippet_panel(m, info.get("type", "untyped")) for m, info in sorted(items.items()))
+        return out
+
+    def _snippet_panel(self, metric, mtype, datasource=None):
+        text = (
+            f"          - type: {self.suggest_panel_type(mtype)}\n"
+            f"            title: \"{metric}\"\n"
+            f"            query: '{self.suggest_query(metric, mtype)}'"
+        )
+        if datasource:
+            text += f"\n            datasource: {datasource}"
+        return text
+
+    def _comparison_yaml_lines(self, cats, sources):
+        out = [
+            "\n# --- suggested comparison YAML snippet ---\n",
+            "dashboards:",
+            "  comparison:",
+            f"    uid: metric-comparison",
+            f"    title: metric comparison",
+            f"    filename: metric-comparison.json",
+            f"    tags: [comparison]",
+            f"    variables: []",
+            f"    sections:",
+        ]
 
         if cats["shared"]:
-            print(f"      - title: \"shared metrics\"")
-            print(f"        panels:")
-            for m in sorted(cats["shared"].keys()):
-                info = cats["shared"][m]
-                print(f"          - type: comparison")
-                print(f"            title: \"{m}\"")
-                print(f"            metric: \"{m}\"")
-                print(f"            metric_type: \"{info['type']}\"")
-                print(f"            datasources: [{sources[0]}, {sources[1]}]")
-
-        if cats["only_a"]:
-            print(f"      - title: \"{sources[0]} only\"")
-            print(f"        panels:")
-            for m in sorted(cats["only_a"].keys()):
-                info = cats["only_a"][m]
-                panel = self.suggest_panel_type(info["type"])
-                query = self.suggest_query(m, info["type"])
-                print(f"          - type: {panel}")
-                print(f"            title: \"{m}\"")
-                print(f"            query: '{query}'")
-                print(f"            datasource: {sources[0]}")
-
-        if cats["only_b"]:
-            print(f"      - title: \"{sources[1]} only\"")
-            print(f"        panels:")
-            for m in sorted(cats["only_b"].keys()):
-                info = cats["only_b"][m]
-                panel = self.suggest_panel_type(info["type"])
-                query = self.suggest_query(m, info["type"])
-                print(f"          - type: {panel}")
-                print(f"            title: \"{m}\"")
-                print(f"            query: '{query}'")
-                print(f"            datasource: {sources[1]}")
+            out.append(f"      - title: \"shared metrics\"\n        panels:")
+            out.extend(
+                f"          - type: comparison\n"
+                f"            title: \"{m}\"\n"
+                f"            metric: \"{m}\"\n"
+                f"            metric_type: \"{info['type']}\"\n"
+                f"            datasources: [{sources[0]}, {sources[1]}]"
+                for m, info in sorted(cats["shared"].items())
+            )
+
+        for key, ds_name in (("only_a", sources[0]), ("only_b", sources[1])):
+            if cats[key]:
+                out.append(f"      - title: \"{ds_name} only\"\n        panels:")
+                out.extend(self._snippet_panel(m, info["type"], ds_name) for m, info in sorted(cats[key].items()))
+        return out
 
     def generate_discovery_sections(self, sources, include_patterns=None, exclude_patterns=None):
         """Generate dashboard sections from discovered metrics (for auto-generation mode)."""
@@ -1165,9 +1409,11 @@ class MetricDiscovery:
 
         if len(sources) == 1:
             ds_name = sources[0]
-            metrics = self.fetch_metrics(ds_name)
+            metrics, meta = self._parallel(
+                (self.fetch_metrics, ds_name, _glob_selector(include_patterns)),
+                (self.fetch_metadata, ds_name),
+            )
             metrics = self.filter_metrics(metrics, include_patterns, exclude_patterns)
-            meta = self.fetch_metadata(ds_name)
             grouped = self.group_by_prefix({m: meta.get(m, {"type": "untyped"}) for m in metrics})
 
             for prefix, items in grouped.items():
@@ -1183,13 +1429,10 @@ class MetricDiscovery:
                 sections.append({"title": prefix, "panels": panels})
 
         elif len(sources) == 2:
-            cats = self.categorize(sources[0], sources[1])
-            cats["shared"] = {k: v for k, v in cats["shared"].items()
-                             if k in self.filter_metrics(set(cats["shared"].keys()), include_patterns, exclude_patterns)}
-            cats["only_a"] = {k: v for k, v in cats["only_a"].items()
-                             if k in self.filter_metrics(set(cats["only_a"].keys()), include_patterns, exclude_patterns)}
-            cats["only_b"] = {k: v for k, v in cats["only_b"].items()
-                             if k in self.filter_metrics(set(cats["only_b"].keys()), include_patterns, exclude_patterns)}
+            cats = self.filter_categories(
+                self.categorize(sources[0], sources[1], include_patterns),
+                include_patterns, exclude_patterns,
+            )
 
             if cats["shared"]:
                 panels = []
@@ -1235,11 +1478,28 @@ class MetricDiscovery:
 # DASHBOARD BUILDER
 # ──────────────────────────────────────────────────────────────────────────────
 
+# static dashboard-level blocks, shared by every generated dashboard
+_BUILTIN_ANNOTATIONS = {
+    "list": [{
+        "builtIn": 1,
+        "datasource": {"type": "grafana", "uid": "-- Grafana --"},
+        "enable": True,
+        "hide": True,
+        "iconColor": "rgba(0, 211, 255, 1)",
+        "name": "Annotations & Alerts",
+        "type": "dashboard",
+    }]
+}
+_TIMEPICKER = {"refresh_intervals": ["5s", "10s", "30s", "1m", "5m", "15m", "30m"]}
+
+
 class DashboardBuilder:
     def __init__(self, config, panel_factory, layout_engine):
         self.config = config
         self.factory = panel_factory
         self.layout = layout_engine
+        self._section_uses = {}
+        self._panels_cache = {}
 
     def build_navigation_links(self, all_dashboards):
         links = []
@@ -1256,6 +1516,16 @@ class DashboardBuilder:
             })
         return links
 
+    def plan_section_reuse(self, all_dashboards):
+        """Count dashboards sharing one sections list (YAML anchors) so build can reuse panels."""
+        uses = {}
+        for db_cfg in all_dashboards.values():
+            sections = db_cfg.get("sections")
+            if sections:
+                uses[id(sections)] = uses.get(id(sections), 0) + 1
+        self._section_uses = {sid: n for sid, n in uses.items() if n > 1}
+        self._panels_cache = {}
+
     def build_variable(self, name):
         v = self.config.get_variable_def(name)
         if not v:
@@ -1337,7 +1607,7 @@ class DashboardBuilder:
 
         if collapsed:
             # collapsed row: panels are nested inside the row
-            inner_layout = LayoutEngine()
+            inner_layout = self.layout.fork()
             inner_panels = []
             for pcfg in section_cfg.get("panels", []):
                 ptype = pcfg["type"]
@@ -1390,26 +1660,30 @@ class DashboardBuilder:
         var_names = db_cfg.get("variables", [])
         variables = self.build_variables(var_names)
 
-        all_panels = []
-        for section in db_cfg.get("sections", []):
-            all_panels.extend(self.build_section(section))
-
-        if discovery_sections:
-            for section in discovery_sections:
+        # ids and layout restart per dashboard, so a sections list shared by
+        # several dashboards gives the same panels; keep them until its last use
+        sections = db_cfg.get("sections") or []
+        sid = id(sections)
+        uses = self._section_uses.get(sid, 0)
+        hit = self._panels_cache.pop(sid, None) if uses else None
+        if hit is not None and hit[0] is discovery_sections:
+            all_panels = hit[1]
+        else:
+            all_panels = []
+            for section in sections:
                 all_panels.extend(self.build_section(section))
 
+            if discovery_sections:
+                for section in discovery_sections:
+                    all_panels.extend(self.build_section(section))
+        if uses > 1:
+            self._section_uses[sid] = uses - 1
+            self._panels_cache[sid] = (discovery_sections, all_panels)
+        elif uses:
+            del self._section_uses[sid]
+
         return {
-            "annotations": {
-                "list": [{
-                    "builtIn": 1,
-                    "datasource": {"type": "grafana", "uid": "-- Grafana --"},
-                    "enable": True,
-                    "hide": True,
-                    "iconColor": "rgba(0, 211, 255, 1)",
-                    "name": "Annotations & Alerts",
-                    "type": "dashboard",
-                }]
-            },
+            "annotations": _BUILTIN_ANNOTATIONS,
             "description": db_cfg.get("description", ""),
             "editable": gen.get("editable", True),
             "fiscalYearStartMonth": 0,
@@ -1423,9 +1697,7 @@ class DashboardBuilder:
             "tags": db_cfg.get("tags", []),
             "templating": {"list": variables},
             "time": gen.get("time_range", {"from": "now-30m", "to": "now"}),
-            "timepicker": {
-                "refresh_intervals": ["5s", "10s", "30s", "1m", "5m", "15m", "30m"],
-            },
+            "timepicker": _TIMEPICKER,
             "timezone": gen.get("timezone", ""),
             "title": db_cfg.get("title", ""),
             "uid": db_cfg["uid"],
@@ -1437,32 +1709,36 @@ class DashboardBuilder:
 # GRAFANA API PUSH
 # ──────────────────────────────────────────────────────────────────────────────
 
-def push_to_grafana(dashboard, grafana_url, auth_user=None, auth_pass=None, token=None):
-    payload = json.dumps({
+def grafana_auth_header(auth_user=None, auth_pass=None, token=None):
+    if token:
+        return f"Bearer {token}"
+    if auth_user and auth_pass:
+        creds = base64.b64encode(f"{auth_user}:{auth_pass}".encode()).decode()
+        return f"Basic {creds}"
+    return None
+
+
+def push_to_grafana(dashboard, grafana_url, auth_header=None, session=None):
+    """Push one dashboard; returns (ok, message) for the caller to report."""
+    payload = _json_bytes({
         "dashboard": dashboard,
         "overwrite": True,
         "message": "updated by grafana-dashboard-generator",
-    }).encode()
+    })
 
     headers = {"Content-Type": "application/json"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    elif auth_user and auth_pass:
-        creds = base64.b64encode(f"{auth_user}:{auth_pass}".encode()).decode()
-        headers["Authorization"] = f"Basic {creds}"
+    if auth_header:
+        headers["Authorization"] = auth_header
 
     url = f"{grafana_url.rstrip('/')}/api/dashboards/db"
-    req = urllib.request.Request(url, data=payload, headers=headers, method="POST")
+    session = session or HttpSession()
     try:
-        resp = urllib.request.urlopen(req, timeout=30)
-        result = json.loads(resp.read())
+        result = _json_loads(session.request("POST", url, body=payload, headers=headers))
         status = result.get("status", "unknown")
         uid = result.get("uid", dashboard.get("uid", "?"))
-        print(f"  pushed {uid}: {status}")
-        return True
+        return True, f"  pushed {uid}: {status}"
     except (urllib.error.URLError, urllib.error.HTTPError) as e:
-        print(f"  error pushing dashboard: {e}", file=sys.stderr)
-        return False
+        return False, f"  error pushing dashboard {dashboard.get('uid', '?')}: {e}"
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -1470,8 +1746,8 @@ def push_to_grafana(dashboard, grafana_url, auth_user=None, auth_pass=None, toke
 # ──────────────────────────────────────────────────────────────────────────────
 
 def write_dashboard(dashboard, filepath, dry_run=False):
-    data = json.dumps(dashboard, indent=2) + "\n"
-    size = len(data.encode("utf-8"))
+    data = _json_bytes(dashboard, indent=True, newline=True)
+    size = len(data)
     panel_count = len(dashboard.get("panels", []))
     filename = os.path.basename(filepath)
 
@@ -1479,7 +1755,7 @@ def write_dashboard(dashboard, filepath, dry_run=False):
         print(f"  WARNING: {filename} is {size:,} bytes (>750KB ConfigMap limit)")
 
     if not dry_run:
-        with open(filepath, "w") as f:
+        with open(filepath, "wb") as f:
             f.write(data)
 
     print(f"  {filename}: {panel_count} panels, {size:,} bytes")
@@ -1524,9 +1800,10 @@ def main():
         output_dir = os.path.join(os.path.dirname(os.path.abspath(args.config)), output_dir)
     os.makedirs(output_dir, exist_ok=True)
 
+    discovery_cfg = config.get_discovery()
+
     # discovery mode
     if args.discover_print:
-        discovery_cfg = config.get_discovery()
         sources = discovery_cfg.get("sources", [])
         if not sources:
             ds_map = config.data.get("datasources", {})
@@ -1557,10 +1834,10 @@ def main():
 
     # build navigation links from all dashboards
     nav_links = builder.build_navigation_links(dashboards)
+    builder.plan_section_reuse(dashboards)
 
     # auto-discovery sections if enabled
     discovery_sections = None
-    discovery_cfg = config.get_discovery()
     if discovery_cfg.get("enabled"):
         sources = discovery_cfg.get("sources", [])
         if sources:
@@ -1571,9 +1848,13 @@ def main():
                 exclude_patterns=discovery_cfg.get("exclude_patterns"),
             )
 
+    # one keep-alive session for every push in this run
+    session = HttpSession() if args.push and args.grafana_url else None
+
     # generate dashboards
     total_size = 0
     total_panels = 0
+    pending = []
     print("grafana dashboard generator:")
 
     for name, db_cfg in dashboards.items():
@@ -1585,20 +1866,35 @@ def main():
         total_size += size
         total_panels += len(dashboard.get("panels", []))
 
-        if args.verbose:
-            for panel in dashboard.get("panels", []):
-                ptype = panel.get("type", "?")
-                ptitle = panel.get("title", "?")
-                print(f"    [{ptype}] {ptitle}")
+        if args.verbose and dashboard.get("panels"):
+            sys.stdout.write("".join(
+                f"    [{panel.get('type', '?')}] {panel.get('title', '?')}\n"
+                for panel in dashboard["panels"]
+            ))
+
+        if session:
+            pending.append(dashboard)
+
+    # push concurrently; grafana-side validation dominates each request
+    if pending:
+        auth_header = grafana_auth_header(
+            auth_user=args.grafana_user,
+            auth_pass=args.grafana_pass,
+            token=args.grafana_token,
+        )
 
-        if args.push and args.grafana_url:
-            push_to_grafana(
+        def push(dashboard):
+            return push_to_grafana(
                 dashboard, args.grafana_url,
-                auth_user=args.grafana_user,
-                auth_pass=args.grafana_pass,
-                token=args.grafana_token,
+                auth_header=auth_header,
+                session=session,
             )
 
+        # report from this thread, in dashboard order
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for ok, message in pool.map(push, pending):
+                print(message, file=sys.stdout if ok else sys.stderr)
+
     print(f"\n  total: {len(dashboards)} dashboards, {total_panels} panels, {total_size:,} bytes")
 
 